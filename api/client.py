@@ -7,6 +7,10 @@ import requests
 
 logger = logging.getLogger(__name__)
 
+# Keys which must be present in payloads sent to Fermentrack
+_REQUIRED_CONFIG_KEYS = frozenset(("cs", "cc", "devices"))
+_REQUIRED_STATUS_AUTH = frozenset(("apiKey", "deviceID"))
+
 
 class APIError(Exception):
     """API communication error."""
@@ -31,6 +35,10 @@ class FermentrackClient:
             fermentrack_api_key: API key for authentication
             timeout: Request timeout in seconds
         """
+        # ETag from the last full config response, used for conditional GETs
+        self._full_config_etag = None
+        self._full_config_cache = None
+
         self.base_url = base_url
         self.device_id = device_id
         self.fermentrack_api_key = fermentrack_api_key
@@ -41,6 +49,31 @@ class FermentrackClient:
         self.messages_endpoint = "/api/brewpi/device/messages/"
         self.full_config_endpoint = "/api/brewpi/device/fullconfig/"
 
+    @property
+    def device_id(self) -> str:
+        """Device ID for authentication."""
+        return self._device_id
+
+    @device_id.setter
+    def device_id(self, value: str) -> None:
+        self._device_id = value
+        self._clear_full_config_cache()
+
+    @property
+    def fermentrack_api_key(self) -> str:
+        """API key for authentication."""
+        return self._fermentrack_api_key
+
+    @fermentrack_api_key.setter
+    def fermentrack_api_key(self, value: str) -> None:
+        self._fermentrack_api_key = value
+        self._clear_full_config_cache()
+
+    def _clear_full_config_cache(self) -> None:
+        """Forget the cached full config, which belongs to the previous credentials."""
+        self._full_config_etag = None
+        self._full_config_cache = None
+
     def _get_auth_params(self) -> Dict[str, str]:
         """Get authentication parameters."""
         if not self.device_id or not self.fermentrack_api_key:
@@ -96,8 +129,9 @@ class FermentrackClient:
             Status response with potential mode/setpoint updates
         """
         # Ensure both apiKey and deviceID are included
-        if not ("apiKey" in status_data and "deviceID" in status_data):
-            raise APIError("Missing apiKey or deviceID in status data")
+        missing = _REQUIRED_STATUS_AUTH - status_data.keys()
+        if missing:
+            raise APIError(f"Missing required keys in status data: {', '.join(sorted(missing))}")
 
         logger.debug("Sending status update")
         response = requests.put(
@@ -172,8 +206,9 @@ class FermentrackClient:
         # Format data as expected by Fermentrack (cs, cc, devices)
         formatted_data = {}
 
-        if 'cs' not in config_data or 'cc' not in config_data or 'devices' not in config_data:
-            raise APIError("Missing required keys in configuration data: 'cs', 'cc', 'devices'")
+        missing = _REQUIRED_CONFIG_KEYS - config_data.keys()
+        if missing:
+            raise APIError(f"Missing required keys in configuration data: {', '.join(sorted(missing))}")
 
         formatted_data["cs"] = config_data["cs"]  # Add control settings (cs)
         formatted_data["cc"] = config_data["cc"]  # Add control constants (cc)
@@ -206,18 +241,29 @@ class FermentrackClient:
         if not auth_params:
             raise APIError("Missing device ID or API key in configuration.")
 
+        headers = {"If-None-Match": self._full_config_etag} if self._full_config_etag else None
+
         logger.debug("Fetching full configuration")
         response = requests.get(
             self._get_url(self.full_config_endpoint),
             params=auth_params,
+            headers=headers,
             timeout=self.timeout
         )
 
+        # The configuration hasn't changed since we last fetched it, so reuse the cached copy
+        if response.status_code == 304 and self._full_config_cache is not None:
+            logger.debug("Full configuration not modified since last fetch")
+            return self._full_config_cache
+
         response_data = self._handle_response(response)
+        self._full_config_etag = response.headers.get("ETag")
 
         # The API returns the config inside a 'config' field
         if 'config' in response_data:
-            return response_data['config']
+            self._full_config_cache = response_data['config']
+        else:
+            # Fallback to the old format if 'config' field is not present
+            self._full_config_cache = response_data
 
-        # Fallback to the old format if 'config' field is not present
-        return response_data
+        return self._full_config_cache
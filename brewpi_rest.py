@@ -50,6 +50,7 @@ class BrewPiRest:
         self.last_status_update = time.time() - (STATUS_UPDATE_INTERVAL - 5)  # Trigger the initial update after 5 secs
         self.last_message_check = 0
         self.last_full_config_update = 0  # Trigger the initial config update immediately
+        self._status_template = None  # Built in setup() once the device identification is known
 
         # Watchdog attributes
         self.last_heartbeat = time.time()
@@ -64,6 +65,9 @@ class BrewPiRest:
         """
         logger.info("Setting up Serial-to-Fermentrack")
 
+        # Pre-build the status payload with the device identification already populated
+        self._build_status_template()
+
         # Initialize API client with configuration
         self.api_client = FermentrackClient(
             base_url=self.config.DEFAULT_API_URL,
@@ -93,6 +97,18 @@ class BrewPiRest:
             logger.error(f"Failed to initialize controller: {e}")
             return False
 
+    def _build_status_template(self) -> None:
+        """Build the skeleton status payload used by update_status."""
+        self._status_template = {
+            "lcd": None,
+            "temps": None,
+            "temp_format": None,
+            "mode": None,
+            # Add device identification for Fermentrack
+            "apiKey": self.config.FERMENTRACK_API_KEY,
+            "deviceID": self.config.DEVICE_ID
+        }
+
     def check_configuration(self) -> bool:
         """Check if the configuration is valid.
 
@@ -131,15 +147,11 @@ class BrewPiRest:
 
             # Send status to Fermentrack
             # Prepare status data with the four essential keys from controller
-            status_data = {
-                "lcd": status.lcd,
-                "temps": status.temps,
-                "temp_format": status.temp_format,
-                "mode": status.mode,
-                # Add device identification for Fermentrack
-                "apiKey": self.config.FERMENTRACK_API_KEY,
-                "deviceID": self.config.DEVICE_ID
-            }
+            status_data = self._status_template.copy()
+            status_data["lcd"] = status.lcd
+            status_data["temps"] = status.temps
+            status_data["temp_format"] = status.temp_format
+            status_data["mode"] = status.mode
 
             # Send the status data
             response = self.api_client.send_status_raw(status_data)
@@ -490,7 +502,8 @@ class BrewPiRest:
             # Reload the config to update the properties
             self.config.device_config = device_config  # Directly update the internal dict first
             self.config._load_device_config(self.config.location)  # Reload to ensure properties are updated
-            
+            self._build_status_template()
+
             logger.info(f"Device successfully re-registered with Fermentrack (Name: {device_name}, ID: {new_device_id})")
             return True
 
@@ -13,6 +13,18 @@ from .serial_controller import SerialController, SerialControllerError
 
 logger = logging.getLogger(__name__)
 
+# Map our desired temperature output keys to the possible input keys from the controller
+_TEMP_KEY_MAP = {
+    "BeerTemp":   ("beerTemp",   "BeerTemp"),
+    "BeerSet":    ("beerSet",    "BeerSet"),
+    "FridgeTemp": ("fridgeTemp", "FridgeTemp"),
+    "FridgeSet":  ("fridgeSet",  "FridgeSet"),
+    "RoomTemp":   ("roomTemp",   "RoomTemp"),
+    "BeerAnn":    ("beerAnn",    "BeerAnn"),
+    "FridgeAnn":  ("fridgeAnn",  "FridgeAnn"),
+    "State":      ("state",      "State"),
+}
+
 
 class BrewPiController:
     """Controls a BrewPi device via serial communication."""
@@ -506,26 +518,12 @@ class BrewPiController:
         Returns:
             Dict with parsed temperature data with appropriate keys and types
         """
-        # map our desired output keys to the possible input keys
-        key_map = {
-            "BeerTemp":   ("beerTemp",   "BeerTemp"),
-            "BeerSet":    ("beerSet",    "BeerSet"),
-            "FridgeTemp": ("fridgeTemp", "FridgeTemp"),
-            "FridgeSet":  ("fridgeSet",  "FridgeSet"),
-            "RoomTemp":   ("roomTemp",   "RoomTemp"),
-            "BeerAnn":    ("beerAnn",    "BeerAnn"),
-            "FridgeAnn":  ("fridgeAnn",  "FridgeAnn"),
-            "State":      ("state",      "State"),
+        # pick the first candidate key that actually exists in raw_dict for each of our desired output keys
+        parsed: Dict[str, Any] = {
+            out_key: next((raw_dict[k] for k in candidates if k in raw_dict), None)
+            for out_key, candidates in _TEMP_KEY_MAP.items()
         }
 
-        parsed: Dict[str, Any] = {}
-        for out_key, candidates in key_map.items():
-            # pick the first one that actually exists in raw_dict
-            parsed[out_key] = next(
-                (raw_dict[k] for k in candidates if k in raw_dict),
-                None
-            )
-
         if parsed['RoomTemp'] == '':
             # If the room temperature is empty, set it to None
             parsed['RoomTemp'] = None
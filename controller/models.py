@@ -348,6 +348,11 @@ class ControllerStatus(BaseModel):
                 
         return temps
 
+    class Config:
+        """Pydantic configuration."""
+        # Status is read from the controller and sent to Fermentrack as-is, so it should never be modified in between
+        frozen = True
+
 
 class MessageStatus(BaseModel):
     """Message flags for communication with Fermentrack."""
@@ -372,6 +377,7 @@ class MessageStatus(BaseModel):
     class Config:
         """Pydantic configuration."""
         populate_by_name = True
+        frozen = True
 
 
 class FullConfig(BaseModel):
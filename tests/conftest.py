@@ -0,0 +1,53 @@
+"""Fixtures shared by the BrewPiRest test modules."""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict
+from unittest.mock import MagicMock
+
+import pytest
+
+
+# Tests add to and overwrite the device and app configs, so each stub gets its own copies
+_DEVICE_CONFIG_TEMPLATE = {"location": "1-1", "fermentrack_id": "test123"}
+_APP_CONFIG_TEMPLATE = {"fermentrack_api_key": "abc456"}
+
+
+@dataclass
+class _ConfigStub:
+    """Lightweight stand-in for Config exposing only what BrewPiRest reads."""
+    DEFAULT_API_URL: str = "http://localhost:8000"
+    API_TIMEOUT: int = 10
+    SERIAL_PORT: str = "/dev/ttyUSB0"  # Mock the result of port detection
+    LOG_DIR: str = "/tmp/brewpi-rest/logs"
+    LOG_LEVEL: str = "INFO"
+    LOG_FILE: str = "/tmp/brewpi-rest/logs/brewpi_rest.log"
+    LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    location: str = "1-1"
+    device_config: Dict[str, Any] = field(default_factory=_DEVICE_CONFIG_TEMPLATE.copy)
+    app_config: Dict[str, Any] = field(default_factory=_APP_CONFIG_TEMPLATE.copy)
+
+    # Read from the config dicts like Config does, so re-registration changes them
+    @property
+    def DEVICE_ID(self) -> str:
+        return self.device_config["fermentrack_id"]
+
+    @property
+    def FERMENTRACK_API_KEY(self) -> str:
+        return self.app_config["fermentrack_api_key"]
+
+    def get_api_url(self, endpoint: str) -> str:
+        return f"{self.DEFAULT_API_URL}{endpoint}"
+
+
+@pytest.fixture
+def mock_config():
+    """Create a mock configuration object."""
+    mock_config = _ConfigStub()
+
+    # Mock methods - tests assert against these
+    mock_config.save_device_config = MagicMock()
+    mock_config.save_app_config = MagicMock()
+    mock_config.delete_device_config = MagicMock(return_value=True)  # Config returns True once the file is gone
+    mock_config._load_device_config = MagicMock()
+
+    return mock_config
@@ -1,56 +1,52 @@
 """Tests for API client."""
 
-import json
-
 import pytest
 import requests
-import requests_mock
 from unittest.mock import patch, MagicMock
 
 from bpr.api.client import FermentrackClient, APIError
 
 
-def test_send_status_raw():
+def test_send_status_raw(requests_mock):
     """Test sending raw status updates (C++ format)."""
-    with requests_mock.Mocker() as m:
-        # Mock successful status update
-        m.put(
-            "http://localhost:8000/api/brewpi/device/status/",
-            json={"updated_mode": "b", "has_messages": True}
-        )
-
-        client = FermentrackClient(
-            base_url="http://localhost:8000",
-            device_id="test123",
-            fermentrack_api_key="abc456"
-        )
-
-        # Prepare status data in the C++ format
-        status_data = {
-            "lcd": {"1": "Line 1", "2": "Line 2", "3": "Line 3", "4": "Line 4"},
-            "temps": {"beer": 20.5, "fridge": 18.2, "room": 22.1},
-            "temp_format": "C",
-            "mode": "o",
-            "apiKey": "abc456",
-            "deviceID": "test123"
-        }
-
-        result = client.send_status_raw(status_data)
+    # Mock successful status update
+    requests_mock.put(
+        "http://localhost:8000/api/brewpi/device/status/",
+        json={"updated_mode": "b", "has_messages": True}
+    )
 
-        # Check result
-        assert result["updated_mode"] == "b"
-        assert result["has_messages"] is True
+    client = FermentrackClient(
+        base_url="http://localhost:8000",
+        device_id="test123",
+        fermentrack_api_key="abc456"
+    )
 
-        # Check request data
-        request = m.request_history[0]
-        request_data = json.loads(request.text)
-        assert request_data["deviceID"] == "test123"
-        assert request_data["apiKey"] == "abc456"
-        assert request_data["mode"] == "o"
-        assert "lcd" in request_data
-        assert "temps" in request_data
-        assert "temp_format" in request_data
-        assert request_data["temps"]["beer"] == 20.5
+    # Prepare status data in the C++ format
+    status_data = {
+        "lcd": {"1": "Line 1", "2": "Line 2", "3": "Line 3", "4": "Line 4"},
+        "temps": {"beer": 20.5, "fridge": 18.2, "room": 22.1},
+        "temp_format": "C",
+        "mode": "o",
+        "apiKey": "abc456",
+        "deviceID": "test123"
+    }
+
+    result = client.send_status_raw(status_data)
+
+    # Check result
+    assert result["updated_mode"] == "b"
+    assert result["has_messages"] is True
+
+    # Check request data
+    request = requests_mock.request_history[0]
+    request_data = request.json()
+    assert request_data["deviceID"] == "test123"
+    assert request_data["apiKey"] == "abc456"
+    assert request_data["mode"] == "o"
+    assert "lcd" in request_data
+    assert "temps" in request_data
+    assert "temp_format" in request_data
+    assert request_data["temps"]["beer"] == 20.5
 
 
 def test_send_status_raw_missing_auth():
@@ -62,7 +58,7 @@ def test_send_status_raw_missing_auth():
     )
 
     # Missing apiKey and deviceID
-    with pytest.raises(APIError, match="Missing apiKey or deviceID in status data"):
+    with pytest.raises(APIError, match="^Missing required keys in status data: apiKey, deviceID$"):
         client.send_status_raw({
             "lcd": {},
             "temps": {},
@@ -71,7 +67,7 @@ def test_send_status_raw_missing_auth():
         })
 
     # Missing only apiKey
-    with pytest.raises(APIError, match="Missing apiKey or deviceID in status data"):
+    with pytest.raises(APIError, match="^Missing required keys in status data: apiKey$"):
         client.send_status_raw({
             "lcd": {},
             "temps": {},
@@ -81,7 +77,7 @@ def test_send_status_raw_missing_auth():
         })
 
 
-def test_send_status_not_registered():
+def test_send_status_not_registered(requests_mock):
     """Test sending status without device ID or API key."""
     client = FermentrackClient(
         base_url="http://localhost:8000",
@@ -90,7 +86,7 @@ def test_send_status_not_registered():
     )
 
     # Test with no deviceID and apiKey params at all
-    with pytest.raises(APIError, match="Missing apiKey or deviceID in status data"):
+    with pytest.raises(APIError, match="^Missing required keys in status data: apiKey, deviceID$"):
         status_data = {
             "lcd": {},
             "temps": {},
@@ -100,160 +96,155 @@ def test_send_status_not_registered():
         client.send_status_raw(status_data)
 
     # Mock the response for empty auth credentials
-    with requests_mock.Mocker() as m:
-        # Mock a 400 error for invalid credentials
-        m.put(
-            "http://localhost:8000/api/brewpi/device/status/",
-            status_code=400,
-            json={"success": False, "message": "Invalid Device ID or API Key format", "msg_code": 6}
-        )
-
-        # Test with empty deviceID and apiKey values
-        with pytest.raises(APIError, match="API request failed"):
-            status_data = {
-                "lcd": {},
-                "temps": {},
-                "temp_format": "C",
-                "mode": "o",
-                "deviceID": "",
-                "apiKey": ""
-            }
-            client.send_status_raw(status_data)
-
-
-def test_get_messages():
+    # Mock a 400 error for invalid credentials
+    requests_mock.put(
+        "http://localhost:8000/api/brewpi/device/status/",
+        status_code=400,
+        json={"success": False, "message": "Invalid Device ID or API Key format", "msg_code": 6}
+    )
+
+    # Test with empty deviceID and apiKey values
+    with pytest.raises(APIError, match="API request failed"):
+        status_data = {
+            "lcd": {},
+            "temps": {},
+            "temp_format": "C",
+            "mode": "o",
+            "deviceID": "",
+            "apiKey": ""
+        }
+        client.send_status_raw(status_data)
+
+
+def test_get_messages(requests_mock):
     """Test getting messages."""
-    with requests_mock.Mocker() as m:
-        # Mock successful messages response
-        m.get(
-            "http://localhost:8000/api/brewpi/device/messages/",
-            json={"updated_cs": True, "reset_eeprom": False}
-        )
+    # Mock successful messages response
+    requests_mock.get(
+        "http://localhost:8000/api/brewpi/device/messages/",
+        json={"updated_cs": True, "reset_eeprom": False}
+    )
 
-        client = FermentrackClient(
-            base_url="http://localhost:8000",
-            device_id="test123",
-            fermentrack_api_key="abc456"
-        )
+    client = FermentrackClient(
+        base_url="http://localhost:8000",
+        device_id="test123",
+        fermentrack_api_key="abc456"
+    )
 
-        result = client.get_messages()
+    result = client.get_messages()
 
-        # Check result
-        assert result["updated_cs"] is True
-        assert result["reset_eeprom"] is False
+    # Check result
+    assert result["updated_cs"] is True
+    assert result["reset_eeprom"] is False
 
-        # Check that the request URL contains credentials
-        request = m.request_history[0]
-        assert "test123" in request.url
-        assert "abc456" in request.url
+    # Check that the request URL contains credentials
+    request = requests_mock.request_history[0]
+    assert "test123" in request.url
+    assert "abc456" in request.url
 
 
-def test_mark_message_processed():
+def test_mark_message_processed(requests_mock):
     """Test marking message as processed."""
-    with requests_mock.Mocker() as m:
-        # Mock successful response
-        m.patch(
-            "http://localhost:8000/api/brewpi/device/messages/",
-            json={"updated_cs": False}
-        )
+    # Mock successful response
+    requests_mock.patch(
+        "http://localhost:8000/api/brewpi/device/messages/",
+        json={"updated_cs": False}
+    )
 
-        client = FermentrackClient(
-            base_url="http://localhost:8000",
-            device_id="test123",
-            fermentrack_api_key="abc456"
-        )
+    client = FermentrackClient(
+        base_url="http://localhost:8000",
+        device_id="test123",
+        fermentrack_api_key="abc456"
+    )
 
-        result = client.mark_message_processed("updated_cs")
+    result = client.mark_message_processed("updated_cs")
 
-        # Check result
-        assert result["updated_cs"] is False
+    # Check result
+    assert result["updated_cs"] is False
 
-        # Check request data
-        request = m.request_history[0]
-        request_data = json.loads(request.text)
-        assert request_data["deviceID"] == "test123"
-        assert request_data["apiKey"] == "abc456"
-        assert request_data["updated_cs"] is False
+    # Check request data
+    request = requests_mock.request_history[0]
+    request_data = request.json()
+    assert request_data["deviceID"] == "test123"
+    assert request_data["apiKey"] == "abc456"
+    assert request_data["updated_cs"] is False
 
 
-def test_send_full_config():
+def test_send_full_config(requests_mock):
     """Test sending full configuration."""
-    with requests_mock.Mocker() as m:
-        # Mock successful response
-        m.put(
-            "http://localhost:8000/api/brewpi/device/fullconfig/",
-            json={"status": "success"}
-        )
-
-        client = FermentrackClient(
-            base_url="http://localhost:8000",
-            device_id="test123",
-            fermentrack_api_key="abc456"
-        )
-
-        # Config data with cs/cc/devices format
-        config_data = {
-            "cs": {"mode": "o", "beerSet": 20.0},
-            "cc": {"Kp": 20.0, "Ki": 0.5},
-            "devices": []
-        }
+    # Mock successful response
+    requests_mock.put(
+        "http://localhost:8000/api/brewpi/device/fullconfig/",
+        json={"status": "success"}
+    )
+
+    client = FermentrackClient(
+        base_url="http://localhost:8000",
+        device_id="test123",
+        fermentrack_api_key="abc456"
+    )
+
+    # Config data with cs/cc/devices format
+    config_data = {
+        "cs": {"mode": "o", "beerSet": 20.0},
+        "cc": {"Kp": 20.0, "Ki": 0.5},
+        "devices": []
+    }
 
-        result = client.send_full_config(config_data)
+    result = client.send_full_config(config_data)
 
-        # Check result
-        assert result["status"] == "success"
+    # Check result
+    assert result["status"] == "success"
 
-        # Check request data
-        request = m.request_history[0]
-        request_data = json.loads(request.text)
-        assert request_data["deviceID"] == "test123"
-        assert request_data["apiKey"] == "abc456"
-        # Now it should be formatted with cs/cc keys
-        assert request_data["cs"]["mode"] == "o"
-        assert request_data["cc"]["Kp"] == 20.0
-        # S2F version should not be included when not provided
-        assert "s2f" not in request_data
+    # Check request data
+    request = requests_mock.request_history[0]
+    request_data = request.json()
+    assert request_data["deviceID"] == "test123"
+    assert request_data["apiKey"] == "abc456"
+    # Now it should be formatted with cs/cc keys
+    assert request_data["cs"]["mode"] == "o"
+    assert request_data["cc"]["Kp"] == 20.0
+    # S2F version should not be included when not provided
+    assert "s2f" not in request_data
 
 
-def test_send_full_config_with_version():
+def test_send_full_config_with_version(requests_mock):
     """Test sending full configuration with S2F version."""
-    with requests_mock.Mocker() as m:
-        # Mock successful response
-        m.put(
-            "http://localhost:8000/api/brewpi/device/fullconfig/",
-            json={"status": "success"}
-        )
-
-        client = FermentrackClient(
-            base_url="http://localhost:8000",
-            device_id="test123",
-            fermentrack_api_key="abc456"
-        )
-
-        # Config data with cs/cc/devices format
-        config_data = {
-            "cs": {"mode": "o", "beerSet": 20.0},
-            "cc": {"Kp": 20.0, "Ki": 0.5},
-            "devices": []
-        }
+    # Mock successful response
+    requests_mock.put(
+        "http://localhost:8000/api/brewpi/device/fullconfig/",
+        json={"status": "success"}
+    )
 
-        # Version string
-        version = "0.1.0"
+    client = FermentrackClient(
+        base_url="http://localhost:8000",
+        device_id="test123",
+        fermentrack_api_key="abc456"
+    )
+
+    # Config data with cs/cc/devices format
+    config_data = {
+        "cs": {"mode": "o", "beerSet": 20.0},
+        "cc": {"Kp": 20.0, "Ki": 0.5},
+        "devices": []
+    }
+
+    # Version string
+    version = "0.1.0"
 
-        result = client.send_full_config(config_data, s2f_version=version)
+    result = client.send_full_config(config_data, s2f_version=version)
 
-        # Check result
-        assert result["status"] == "success"
+    # Check result
+    assert result["status"] == "success"
 
-        # Check request data
-        request = m.request_history[0]
-        request_data = json.loads(request.text)
-        assert request_data["deviceID"] == "test123"
-        assert request_data["apiKey"] == "abc456"
-        assert request_data["cs"]["mode"] == "o"
-        assert request_data["cc"]["Kp"] == 20.0
-        # S2F version should be included
-        assert request_data["s2f"] == "0.1.0"
+    # Check request data
+    request = requests_mock.request_history[0]
+    request_data = request.json()
+    assert request_data["deviceID"] == "test123"
+    assert request_data["apiKey"] == "abc456"
+    assert request_data["cs"]["mode"] == "o"
+    assert request_data["cc"]["Kp"] == 20.0
+    # S2F version should be included
+    assert request_data["s2f"] == "0.1.0"
 
 
 def test_send_full_config_missing_keys():
@@ -265,94 +256,92 @@ def test_send_full_config_missing_keys():
     )
 
     # Test missing cs
-    with pytest.raises(APIError, match="Missing required keys in configuration data"):
+    with pytest.raises(APIError, match="^Missing required keys in configuration data: cs$"):
         client.send_full_config({
             "cc": {"Kp": 20.0, "Ki": 0.5},
             "devices": []
         })
 
     # Test missing cc
-    with pytest.raises(APIError, match="Missing required keys in configuration data"):
+    with pytest.raises(APIError, match="^Missing required keys in configuration data: cc$"):
         client.send_full_config({
             "cs": {"mode": "o", "beerSet": 20.0},
             "devices": []
         })
 
     # Test missing devices
-    with pytest.raises(APIError, match="Missing required keys in configuration data"):
+    with pytest.raises(APIError, match="^Missing required keys in configuration data: devices$"):
         client.send_full_config({
             "cs": {"mode": "o", "beerSet": 20.0},
             "cc": {"Kp": 20.0, "Ki": 0.5}
         })
 
 
-def test_get_full_config():
+def test_get_full_config(requests_mock):
     """Test getting full configuration."""
     # Test 1: Direct response format (without 'config' field)
-    with requests_mock.Mocker() as m:
-        # Mock successful response in direct format
-        config_data = {
-            "cs": {"mode": "o", "beerSet": 20.0},
-            "cc": {"Kp": 20.0, "Ki": 0.5, "tempFormat": "C"},
-            "devices": []
-        }
-
-        m.get(
-            "http://localhost:8000/api/brewpi/device/fullconfig/",
-            json=config_data
-        )
+    # Mock successful response in direct format
+    config_data = {
+        "cs": {"mode": "o", "beerSet": 20.0},
+        "cc": {"Kp": 20.0, "Ki": 0.5, "tempFormat": "C"},
+        "devices": []
+    }
+
+    requests_mock.get(
+        "http://localhost:8000/api/brewpi/device/fullconfig/",
+        json=config_data
+    )
 
-        client = FermentrackClient(
-            base_url="http://localhost:8000",
-            device_id="test123",
-            fermentrack_api_key="abc456"
-        )
+    client = FermentrackClient(
+        base_url="http://localhost:8000",
+        device_id="test123",
+        fermentrack_api_key="abc456"
+    )
 
-        result = client.get_full_config()
+    result = client.get_full_config()
 
-        # Check result
-        assert result["cs"]["mode"] == "o"
-        assert result["cc"]["Kp"] == 20.0
-        assert result["cc"]["tempFormat"] == "C"
+    # Check result
+    assert result["cs"]["mode"] == "o"
+    assert result["cc"]["Kp"] == 20.0
+    assert result["cc"]["tempFormat"] == "C"
 
-        # Check that the request URL contains credentials
-        request = m.request_history[0]
-        assert "test123" in request.url
-        assert "abc456" in request.url
+    # Check that the request URL contains credentials
+    request = requests_mock.request_history[0]
+    assert "test123" in request.url
+    assert "abc456" in request.url
 
     # Test 2: Response with 'config' field (new format)
-    with requests_mock.Mocker() as m:
-        # Mock successful response with config field
-        config_data = {
-            "cs": {"mode": "f", "beerSet": 21.0},
-            "cc": {"Kp": 10.0, "Ki": 0.25, "tempFormat": "C"},
-            "devices": []
-        }
-
-        response_data = {
-            "success": True,
-            "message": "Full config retrieved",
-            "msg_code": 0,
-            "config": config_data
-        }
-
-        m.get(
-            "http://localhost:8000/api/brewpi/device/fullconfig/",
-            json=response_data
-        )
+    # Mock successful response with config field
+    config_data = {
+        "cs": {"mode": "f", "beerSet": 21.0},
+        "cc": {"Kp": 10.0, "Ki": 0.25, "tempFormat": "C"},
+        "devices": []
+    }
+
+    response_data = {
+        "success": True,
+        "message": "Full config retrieved",
+        "msg_code": 0,
+        "config": config_data
+    }
+
+    requests_mock.get(
+        "http://localhost:8000/api/brewpi/device/fullconfig/",
+        json=response_data
+    )
 
-        client = FermentrackClient(
-            base_url="http://localhost:8000",
-            device_id="test123",
-            fermentrack_api_key="abc456"
-        )
+    client = FermentrackClient(
+        base_url="http://localhost:8000",
+        device_id="test123",
+        fermentrack_api_key="abc456"
+    )
 
-        result = client.get_full_config()
+    result = client.get_full_config()
 
-        # Check result
-        assert result["cs"]["mode"] == "f"
-        assert result["cc"]["Kp"] == 10.0
-        assert result["cc"]["tempFormat"] == "C"
+    # Check result
+    assert result["cs"]["mode"] == "f"
+    assert result["cc"]["Kp"] == 10.0
+    assert result["cc"]["tempFormat"] == "C"
 
 
 def test_get_full_config_no_auth():
@@ -367,23 +356,22 @@ def test_get_full_config_no_auth():
         client.get_full_config()
 
 
-def test_get_messages_http_error():
+def test_get_messages_http_error(requests_mock):
     """Test handling HTTP errors in get_messages."""
-    with requests_mock.Mocker() as m:
-        m.get(
-            "http://localhost:8000/api/brewpi/device/messages/",
-            status_code=500,
-            json={"error": "Server error"}
-        )
+    requests_mock.get(
+        "http://localhost:8000/api/brewpi/device/messages/",
+        status_code=500,
+        json={"error": "Server error"}
+    )
 
-        client = FermentrackClient(
-            base_url="http://localhost:8000",
-            device_id="test123",
-            fermentrack_api_key="abc456"
-        )
+    client = FermentrackClient(
+        base_url="http://localhost:8000",
+        device_id="test123",
+        fermentrack_api_key="abc456"
+    )
 
-        with pytest.raises(APIError, match="API request failed"):
-            client.get_messages()
+    with pytest.raises(APIError, match="API request failed"):
+        client.get_messages()
 
 
 def test_mark_message_processed_no_auth():
@@ -398,23 +386,22 @@ def test_mark_message_processed_no_auth():
         client.mark_message_processed("test_message")
 
 
-def test_json_decode_error():
+def test_json_decode_error(requests_mock):
     """Test handling invalid JSON responses."""
-    with requests_mock.Mocker() as m:
-        # Mock invalid JSON response
-        m.get(
-            "http://localhost:8000/api/brewpi/device/messages/",
-            text="Not JSON"
-        )
+    # Mock invalid JSON response
+    requests_mock.get(
+        "http://localhost:8000/api/brewpi/device/messages/",
+        text="Not JSON"
+    )
 
-        client = FermentrackClient(
-            base_url="http://localhost:8000",
-            device_id="test123",
-            fermentrack_api_key="abc456"
-        )
+    client = FermentrackClient(
+        base_url="http://localhost:8000",
+        device_id="test123",
+        fermentrack_api_key="abc456"
+    )
 
-        with pytest.raises(APIError, match="Invalid JSON response"):
-            client.get_messages()
+    with pytest.raises(APIError, match="Invalid JSON response"):
+        client.get_messages()
 
 
 def test_request_exception():
@@ -450,4 +437,78 @@ def test_request_exception():
     response.raise_for_status.side_effect = request_error
     
     with pytest.raises(APIError, match="Request failed: Generic request error"):
-        client._handle_response(response)
\ No newline at end of file
+        client._handle_response(response)
+
+
+def test_get_messages_is_not_conditional(requests_mock):
+    """Test that get_messages always fetches the pending messages, even when the server sends an ETag."""
+    requests_mock.get(
+        "http://localhost:8000/api/brewpi/device/messages/",
+        json={"messages": {"updated_cs": True}},
+        headers={"ETag": '"abc"'}
+    )
+
+    client = FermentrackClient(
+        base_url="http://localhost:8000",
+        device_id="test123",
+        fermentrack_api_key="abc456"
+    )
+
+    # Unprocessed messages are returned again on the next poll, so they can be retried
+    assert client.get_messages() == {"messages": {"updated_cs": True}}
+    assert client.get_messages() == {"messages": {"updated_cs": True}}
+    assert "If-None-Match" not in requests_mock.request_history[1].headers
+
+
+def test_get_full_config_not_modified(requests_mock):
+    """Test that a 304 response to a conditional GET returns the cached configuration."""
+    config_data = {
+        "cs": {"mode": "o", "beerSet": 20.0},
+        "cc": {"Kp": 20.0, "Ki": 0.5, "tempFormat": "C"},
+        "devices": []
+    }
+
+    requests_mock.get(
+        "http://localhost:8000/api/brewpi/device/fullconfig/",
+        [
+            {"json": {"success": True, "config": config_data}, "headers": {"ETag": '"cfg1"'}},
+            {"status_code": 304},
+        ]
+    )
+
+    client = FermentrackClient(
+        base_url="http://localhost:8000",
+        device_id="test123",
+        fermentrack_api_key="abc456"
+    )
+
+    assert client.get_full_config() == config_data
+    assert client.get_full_config() == config_data
+    assert requests_mock.request_history[1].headers["If-None-Match"] == '"cfg1"'
+
+
+def test_get_full_config_not_modified_after_reregistration(requests_mock):
+    """Test the cached configuration isn't reused once the device is re-registered."""
+    requests_mock.get(
+        "http://localhost:8000/api/brewpi/device/fullconfig/",
+        [
+            {"json": {"success": True, "config": {"cs": {}, "cc": {}, "devices": []}}, "headers": {"ETag": '"cfg1"'}},
+            {"status_code": 304},
+        ]
+    )
+
+    client = FermentrackClient(
+        base_url="http://localhost:8000",
+        device_id="test123",
+        fermentrack_api_key="abc456"
+    )
+    client.get_full_config()
+
+    # Re-registration swaps the credentials on the existing client
+    client.device_id = "new-device-id"
+    client.fermentrack_api_key = "new-api-key"
+
+    with pytest.raises(APIError):
+        client.get_full_config()
+
+    assert "If-None-Match" not in requests_mock.request_history[1].headers
@@ -1,144 +1,163 @@
 """Tests for Serial-to-Fermentrack main application."""
 
-import os
+import logging
 import signal
 import sys
-from unittest.mock import MagicMock, patch
+from unittest.mock import DEFAULT, MagicMock, Mock, patch
 
 import pytest
 
-# Add the parent directory to sys.path so that imports work correctly
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from utils.config import Config
-from brewpi_rest import BrewPiRest
+import brewpi_rest
 from controller.models import ControllerStatus
 from api import APIError
 
 
+# Stands in for the logger main() normally creates, discarding everything the app logs
+_NULL_LOGGER = logging.getLogger("brewpi_rest.tests")
+_NULL_LOGGER.addHandler(logging.NullHandler())
+_NULL_LOGGER.propagate = False
+
+
+# Mock status with the updated model format and LCD content as a list
+# Shared by every test: ControllerStatus is only shallowly frozen, so tests must not mutate temps or lcd in place
+_MOCK_STATUS = ControllerStatus(
+    mode="b",
+    temps={
+        "beerTemp": 20.5,
+        "beerSet": 20.0,
+        "fridgeTemp": 18.2,
+        "fridgeSet": 18.0,
+        "roomTemp": 22.1
+    },
+    lcd=[
+        "Line 1",
+        "Line 2",
+        "Line 3",
+        "Line 4"
+    ],
+    temp_format="C"
+)
+
+# Mock full config in new format with cs/cc/devices keys (shared, so tests must not mutate it)
+_MOCK_FULL_CONFIG = {
+    "cs": {"mode": "b", "beerSet": 20.0, "fridgeSet": 18.0, "heatEst": 0.199, "coolEst": 5.0},
+    "cc": {"Kp": 5.0, "Ki": 0.25, "tempFormat": "C"},
+    "devices": []
+}
+
+
+# Envelope of a successful get_messages response, without the messages themselves
+_MSG_BASE = {"message": "Messages retrieved", "msg_code": 0, "success": True}
+
+# Keys every status payload sent to Fermentrack must include
+_REQUIRED_STATUS_KEYS = frozenset({"lcd", "temps", "temp_format", "mode", "apiKey", "deviceID"})
+
+# send_status_raw responses updating the mode and/or setpoint
+_RESP_MODE_AND_SETPOINT = {"has_messages": True, "updated_mode": "f", "updated_setpoint": 18.5}
+_RESP_MODE_ONLY = {"has_messages": False, "updated_mode": "o", "updated_setpoint": None}  # Off mode
+_RESP_SETPOINT_ONLY = {"has_messages": False, "updated_mode": None, "updated_setpoint": 20.5}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _no_sleep():
+    """Make time.sleep a no-op for every test in this module."""
+    with patch("time.sleep") as mock:
+        yield mock
+
+
 @pytest.fixture
-def mock_config():
-    """Create a mock configuration object."""
-    mock_config = MagicMock(spec=Config)
-
-    # Configure mock properties
-    mock_config.DEFAULT_API_URL = "http://localhost:8000"
-    mock_config.API_TIMEOUT = 10
-    mock_config.DEVICE_ID = "test123"
-    mock_config.FERMENTRACK_API_KEY = "abc456"
-    mock_config.SERIAL_PORT = "/dev/ttyUSB0"  # Mock the result of port detection
-    mock_config.LOG_DIR = "/tmp/brewpi-rest/logs"
-    mock_config.LOG_LEVEL = "INFO"
-    mock_config.LOG_FILE = "/tmp/brewpi-rest/logs/brewpi_rest.log"
-    mock_config.LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-
-    # Mock methods
-    mock_config.get_api_url = lambda endpoint: f"{mock_config.DEFAULT_API_URL}{endpoint}"
-    mock_config.device_config = {"location": "1-1", "fermentrack_id": "test123"}
-    mock_config.save_device_config = MagicMock()
-    mock_config.save_app_config = MagicMock()
-
-    return mock_config
+def mock_sleep(_no_sleep):
+    """Return the module-wide time.sleep mock, with its call history reset for this test."""
+    _no_sleep.reset_mock()
+    return _no_sleep
 
 
 @pytest.fixture
-def mock_controller():
-    """Create a mock BrewPi controller."""
-    with patch("controller.brewpi_controller.BrewPiController") as mock:
-        mock_instance = MagicMock()
-        mock_instance.connect.return_value = True
-        mock_instance.firmware_version = "0.5.0"
-
-        # Create mock status with the updated model format and LCD content as a list
-        mock_status = ControllerStatus(
-            mode="b",
-            temps={
-                "beerTemp": 20.5,
-                "beerSet": 20.0,
-                "fridgeTemp": 18.2,
-                "fridgeSet": 18.0,
-                "roomTemp": 22.1
-            },
-            lcd=[
-                "Line 1",
-                "Line 2",
-                "Line 3",
-                "Line 4"
-            ],
-            temp_format="C"
-        )
-        mock_instance.get_status.return_value = mock_status
-
-        # Create mock full config in new format with cs/cc/devices keys
-        mock_config = {
-            "cs": {"mode": "b", "beerSet": 20.0, "fridgeSet": 18.0, "heatEst": 0.199, "coolEst": 5.0},
-            "cc": {"Kp": 5.0, "Ki": 0.25, "tempFormat": "C"},
-            "devices": []
-        }
-        mock_instance.get_full_config.return_value = mock_config
+def safe_run(monkeypatch):
+    """Stop the app registering signal handlers or exiting the test process, returning the sys.exit mock."""
+    monkeypatch.setattr("signal.signal", MagicMock())
+    mock_exit = MagicMock()
+    monkeypatch.setattr("sys.exit", mock_exit)
+    return mock_exit
 
-        mock.return_value = mock_instance
-        yield mock_instance
+
+@pytest.fixture(scope="module")
+def _patched_classes():
+    """Patch the controller and API client classes in brewpi_rest once for the module."""
+    with patch.multiple("brewpi_rest", BrewPiController=DEFAULT, FermentrackClient=DEFAULT) as mocks:
+        yield mocks
 
 
 @pytest.fixture
-def mock_api_client():
-    """Create a mock API client."""
-    with patch("api.client.FermentrackClient") as mock:
-        mock_instance = MagicMock()
-
-        # Mock device ID and API key
-        mock_instance.device_id = "test123"
-        mock_instance.fermentrack_api_key = "abc456"
-
-        # Mock send_status
-        mock_instance.send_status.return_value = {
-            "has_messages": True
-        }
+def mock_controller(_patched_classes):
+    """Create a mock BrewPi controller, returned by the patched BrewPiController class."""
+    mock_instance = Mock()
+    mock_instance.connect.return_value = True
+    mock_instance.firmware_version = "0.5.0"
+    mock_instance.get_status.return_value = _MOCK_STATUS
+    mock_instance.get_full_config.return_value = _MOCK_FULL_CONFIG
 
-        # Mock get_messages
-        mock_instance.get_messages.return_value = {
-            "message": "Messages retrieved",
-            "messages": {
-                "updated_cs": True,
-                "reset_eeprom": False
-            },
-            "msg_code": 0,
-            "success": True
-        }
+    _patched_classes["BrewPiController"].return_value = mock_instance
+    return mock_instance
+
+
+@pytest.fixture
+def mock_api_client(_patched_classes):
+    """Create a mock API client, returned by the patched FermentrackClient class."""
+    mock_instance = Mock()
 
-        mock.return_value = mock_instance
-        yield mock_instance
+    # Mock device ID and API key
+    mock_instance.device_id = "test123"
+    mock_instance.fermentrack_api_key = "abc456"
+
+    # Mock send_status
+    mock_instance.send_status.return_value = {
+        "has_messages": True
+    }
+
+    # Mock get_messages
+    mock_instance.get_messages.return_value = {**_MSG_BASE, "messages": {"updated_cs": True, "reset_eeprom": False}}
+
+    _patched_classes["FermentrackClient"].return_value = mock_instance
+    return mock_instance
 
 
 @pytest.fixture
 def app(mock_controller, mock_api_client, mock_config):
     """Create a BrewPiRest app instance with mocks."""
-    with patch("brewpi_rest.BrewPiController", return_value=mock_controller), \
-            patch("brewpi_rest.FermentrackClient", return_value=mock_api_client), \
-            patch("brewpi_rest.logger", MagicMock()):
-        # Mock the logger directly in the module
-        import brewpi_rest
-        brewpi_rest.logger = MagicMock()
+    # Replace the module logger directly, restoring the original afterwards
+    original_logger = brewpi_rest.logger
+    brewpi_rest.logger = _NULL_LOGGER
 
-        app = BrewPiRest(mock_config)
+    app = brewpi_rest.BrewPiRest(mock_config)
 
-        # Create a method patch for _attempt_reregistration to make our tests work
-        # The real implementation will be overridden in specific tests
-        app._attempt_reregistration = MagicMock(return_value=False)
+    # Create a method patch for _attempt_reregistration to make our tests work
+    # The real implementation will be overridden in specific tests
+    app._attempt_reregistration = MagicMock(return_value=False)
 
+    try:
         yield app
+    finally:
+        brewpi_rest.logger = original_logger
+
+
+@pytest.fixture
+def ready_app(app):
+    """Create a BrewPiRest app instance which has already been set up and had its configuration checked."""
+    app.setup()
+    app.check_configuration()
+    yield app
 
 
 # Add tests for device reregistration functionality
-def test_attempt_reregistration_success(app, mock_controller, mock_config):
+def test_attempt_reregistration_success(ready_app, mock_controller, mock_config):
     """Test successful device reregistration."""
     # Setup
     mock_controller.firmware_version = "0.2.10"
     mock_controller.board_type = "l"
 
     # Add GUID to device config
-    app.config.device_config["guid"] = "test-guid"
+    ready_app.config.device_config["guid"] = "test-guid"
 
     # Mock the requests.put call
     with patch("requests.put") as mock_put:
@@ -153,65 +172,76 @@ def test_attempt_reregistration_success(app, mock_controller, mock_config):
         mock_put.return_value = mock_response
 
         # Restore the original method (remove our mock)
-        delattr(app, "_attempt_reregistration")
+        delattr(ready_app, "_attempt_reregistration")
 
         # Run reregistration
-        result = app._attempt_reregistration()
+        result = ready_app._attempt_reregistration()
 
         # Check result
         assert result is True
 
         # Check API client was updated
-        assert app.api_client.device_id == "new-device-id"
-        assert app.api_client.fermentrack_api_key == "new-api-key"
+        assert ready_app.api_client.device_id == "new-device-id"
+        assert ready_app.api_client.fermentrack_api_key == "new-api-key"
 
         # Make sure we updated the config file correctly
-        assert app.config.device_config['fermentrack_id'] == "new-device-id"
-        assert app.config.device_config['guid'] == "test-guid"
-
+        assert ready_app.config.device_config['fermentrack_id'] == "new-device-id"
+        assert ready_app.config.device_config['guid'] == "test-guid"
 
-def test_update_status_device_not_found(app, mock_controller, mock_api_client):
-    """Test handling of device not found errors."""
-    # Setup application
-    app.setup()  # This sets up the API client from our mock
 
-    # Setup error message indicating device not found
-    error_msg = "Device ID associated with that API key not found"
+def test_update_status_after_reregistration(ready_app, mock_controller, mock_api_client):
+    """Test the status sent after reregistration carries the new device ID and API key."""
+    mock_controller.board_type = "l"
+    mock_api_client.send_status_raw.return_value = {"has_messages": False}
 
-    # Make status update fail with device not found error
-    app.api_client.send_status_raw.side_effect = Exception(error_msg)
+    with patch("requests.put") as mock_put:
+        mock_put.return_value.status_code = 200
+        mock_put.return_value.json.return_value = {
+            "success": True,
+            "deviceID": "new-device-id",
+            "apiKey": "new-api-key"
+        }
 
-    # Mock the reregistration method
-    with patch.object(app, "_attempt_reregistration") as mock_reregister:
-        mock_reregister.return_value = True
+        # Restore the original method (remove our mock)
+        delattr(ready_app, "_attempt_reregistration")
+        assert ready_app._attempt_reregistration() is True
 
-        # Run update
-        app.update_status()
+    assert ready_app.update_status() is True
 
-        # Check if reregistration was attempted
-        mock_reregister.assert_called_once()
+    call_args = mock_api_client.send_status_raw.call_args[0][0]
+    assert call_args["deviceID"] == "new-device-id"
+    assert call_args["apiKey"] == "new-api-key"
 
 
-def test_update_status_device_not_found_msg_code(app, mock_controller, mock_api_client):
-    """Test handling of device not found errors with msg_code."""
-    # Setup application
-    app.setup()  # This sets up the API client from our mock
+# Errors update_status should recognise as the device having been deleted from Fermentrack
+_DEVICE_NOT_FOUND_ERRORS = [
+    pytest.param(Exception("Device ID associated with that API key not found"), id="message"),
+    pytest.param(Exception('{"msg_code": "3", "message": "Device not found"}'), id="msg_code"),
+    pytest.param(APIError("API request failed: 400 - {'success': False, 'message': 'Device ID associated with that API key not found', 'msg_code': 3}"),
+                 id="api_error"),
+    pytest.param(APIError("API request failed: 400 - {'success': False, 'msg_code': 3}"), id="api_error_msg_code_only"),
+]
 
-    # Setup error message with msg_code=3 (device not found)
-    error_msg = '{"msg_code": "3", "message": "Device not found"}'
 
+@pytest.mark.parametrize("error", _DEVICE_NOT_FOUND_ERRORS)
+@pytest.mark.parametrize("reregistered", [True, False], ids=["reregistered", "reregistration_failed"])
+def test_update_status_device_not_found(ready_app, mock_controller, mock_api_client, error, reregistered):
+    """Test update_status re-registers an unregistered device, and resets the connection if that fails."""
     # Make status update fail with device not found error
-    app.api_client.send_status_raw.side_effect = Exception(error_msg)
+    mock_api_client.send_status_raw.side_effect = error
 
-    # Mock the reregistration method
-    with patch.object(app, "_attempt_reregistration") as mock_reregister:
-        mock_reregister.return_value = True
+    # Mock the reregistration and reset methods
+    ready_app._attempt_reregistration.return_value = reregistered
+    ready_app._handle_reset_connection = MagicMock()
 
-        # Run update
-        app.update_status()
+    result = ready_app.update_status()
 
-        # Check if reregistration was attempted
-        mock_reregister.assert_called_once()
+    # Verify reregistration was attempted, and its result passed back
+    ready_app._attempt_reregistration.assert_called_once()
+    assert result is reregistered
+
+    # Verify reset connection was triggered only if reregistration failed
+    assert ready_app._handle_reset_connection.called is not reregistered
 
 
 def test_brewpi_rest_setup(app, mock_controller, mock_api_client, mock_config):
@@ -246,21 +276,14 @@ def test_brewpi_rest_check_configuration(app, mock_controller, mock_api_client,
     # No need to verify API client methods as check_configuration just validates existing configuration
 
 
-def test_brewpi_rest_update_status_mode_and_setpoint(app, mock_controller, mock_api_client):
+def test_brewpi_rest_update_status_mode_and_setpoint(ready_app, mock_controller, mock_api_client):
     """Test update_status method with both mode and setpoint update."""
-    app.setup()
-    app.check_configuration()
-
     # Set up mocks with both mode and setpoint
-    mock_api_client.send_status_raw.return_value = {
-        "has_messages": True,
-        "updated_mode": "f",
-        "updated_setpoint": 18.5
-    }
+    mock_api_client.send_status_raw.return_value = _RESP_MODE_AND_SETPOINT
 
-    # Update status
-    with patch.object(app, 'check_messages') as mock_check_messages:
-        result = app.update_status()
+    # Update status (the app is per-test, so check_messages can simply be replaced)
+    ready_app.check_messages = MagicMock()
+    result = ready_app.update_status()
 
     # Check result
     assert result is True
@@ -268,282 +291,85 @@ def test_brewpi_rest_update_status_mode_and_setpoint(app, mock_controller, mock_
     # Verify method calls
     mock_controller.get_status.assert_called_once()
     mock_api_client.send_status_raw.assert_called_once()
-    mock_check_messages.assert_called_once()
+    ready_app.check_messages.assert_called_once()
 
     # Verify set_mode_and_temp was called with the correct parameters
     mock_controller.set_mode_and_temp.assert_called_once_with("f", 18.5)
 
     # Verify the correct data format was sent
     call_args = mock_api_client.send_status_raw.call_args[0][0]
-    assert "lcd" in call_args
-    assert "temps" in call_args
-    assert "temp_format" in call_args
-    assert "mode" in call_args
-    assert "apiKey" in call_args
-    assert "deviceID" in call_args
+    assert _REQUIRED_STATUS_KEYS <= call_args.keys(), _REQUIRED_STATUS_KEYS - call_args.keys()
+    assert call_args["apiKey"] == "abc456"
+    assert call_args["deviceID"] == "test123"
+    assert call_args["mode"] == "b"
 
 
-def test_brewpi_rest_update_status_mode_only(app, mock_controller, mock_api_client):
-    """Test update_status method with mode update only."""
-    app.setup()
-    app.check_configuration()
-
-    # Reset mock for a clean test
-    mock_controller.reset_mock()
-    mock_api_client.reset_mock()
-
-    # Set up mocks with mode only
-    mock_api_client.send_status_raw.return_value = {
-        "has_messages": False,
-        "updated_mode": "o",  # Off mode
-        "updated_setpoint": None
-    }
+@pytest.mark.parametrize("response, expected_mode, expected_setpoint", [
+    (_RESP_MODE_ONLY, "o", None),
+    (_RESP_SETPOINT_ONLY, None, 20.5),
+], ids=["mode_only", "setpoint_only"])
+def test_brewpi_rest_update_status_mode_or_setpoint(ready_app, mock_controller, mock_api_client, response,
+                                                    expected_mode, expected_setpoint):
+    """Test update_status method with only one of mode or setpoint updated."""
+    mock_api_client.send_status_raw.return_value = response
 
     # Update status
-    result = app.update_status()
+    result = ready_app.update_status()
 
     # Check result
     assert result is True
 
-    # Verify set_mode_and_temp was called with the correct parameters
-    mock_controller.set_mode_and_temp.assert_called_once_with("o", None)
+    # Verify set_mode_and_temp was called with the correct parameters (None for whichever wasn't updated)
+    mock_controller.set_mode_and_temp.assert_called_once_with(expected_mode, expected_setpoint)
 
 
-def test_brewpi_rest_update_status_setpoint_only(app, mock_controller, mock_api_client):
-    """Test update_status method with setpoint update only."""
-    app.setup()
-    app.check_configuration()
+_MESSAGE_KEYS = ("updated_cs", "reset_eeprom", "restart_device", "default_cs", "default_cc", "refresh_config")
 
-    # Reset mock for a clean test
-    mock_controller.reset_mock()
-    mock_api_client.reset_mock()
 
-    # Set up mocks with setpoint only
-    mock_api_client.send_status_raw.return_value = {
-        "has_messages": False,
-        "updated_mode": None,
-        "updated_setpoint": 20.5
-    }
-
-    # Update status
-    result = app.update_status()
-
-    # Check result
-    assert result is True
-
-    # Verify set_mode_and_temp was called with the correct parameters (mode=None)
-    mock_controller.set_mode_and_temp.assert_called_once_with(None, 20.5)
-
-
-def test_brewpi_rest_check_messages(app, mock_controller, mock_api_client):
-    """Test check_messages method."""
-    app.setup()
-    app.check_configuration()
-
-    # Set up mocks
-    messages = {
-        "message": "Messages retrieved",
-        "messages": {
-            "updated_cs": True,
-            "reset_eeprom": False
-        },
-        "msg_code": 0,
-        "success": True
-    }
-    mock_api_client.get_messages.return_value = messages
+@pytest.mark.parametrize("msg_key", _MESSAGE_KEYS)
+def test_brewpi_rest_check_messages(ready_app, mock_controller, mock_api_client, msg_key):
+    """Test check_messages method marks only the message that was set as processed."""
+    # Set up mocks with every message present but only msg_key set
+    messages = dict.fromkeys(_MESSAGE_KEYS, False)
+    messages[msg_key] = True
+    mock_api_client.get_messages.return_value = {**_MSG_BASE, "messages": messages}
     mock_controller.process_messages.return_value = True
 
     # Check messages
-    result = app.check_messages()
+    result = ready_app.check_messages()
 
     # Check result
     assert result is True
 
     # Verify method calls
-    mock_api_client.get_messages.assert_called_once()
-    mock_controller.process_messages.assert_called_once()
-    mock_api_client.mark_message_processed.assert_called_once_with("updated_cs")
+    assert mock_api_client.get_messages.call_count == 1
+    assert mock_controller.process_messages.call_count == 1
+    mock_api_client.mark_message_processed.assert_called_once_with(msg_key)
 
 
-def test_brewpi_rest_check_messages_reset_eeprom(app, mock_controller, mock_api_client):
-    """Test check_messages method with reset_eeprom message."""
-    app.setup()
-    app.check_configuration()
+def test_brewpi_rest_check_messages_retries_after_failure(ready_app, mock_controller, mock_api_client):
+    """Test a message is processed on the next check if processing it failed the first time."""
+    messages = dict.fromkeys(_MESSAGE_KEYS, False)
+    messages["updated_cs"] = True
+    mock_api_client.get_messages.return_value = {**_MSG_BASE, "messages": messages}
+    mock_controller.process_messages.side_effect = [False, True]
 
-    # Reset mocks for a clean test
-    mock_controller.reset_mock()
-    mock_api_client.reset_mock()
-
-    # Set up mocks with reset_eeprom message
-    messages = {
-        "message": "Messages retrieved",
-        "messages": {
-            "reset_eeprom": True
-        },
-        "msg_code": 0,
-        "success": True
-    }
-    mock_api_client.get_messages.return_value = messages
-    mock_controller.process_messages.return_value = True
+    # The first attempt fails, so nothing is marked as processed
+    ready_app.check_messages()
+    mock_api_client.mark_message_processed.assert_not_called()
 
-    # Check messages
-    result = app.check_messages()
-
-    # Check result
-    assert result is True
-
-    # Verify method calls
-    mock_api_client.get_messages.assert_called_once()
-    mock_controller.process_messages.assert_called_once()
-    mock_api_client.mark_message_processed.assert_called_once_with("reset_eeprom")
-
-
-def test_brewpi_rest_check_messages_restart_device(app, mock_controller, mock_api_client):
-    """Test check_messages method with restart_device message."""
-    app.setup()
-    app.check_configuration()
-
-    # Reset mocks for a clean test
-    mock_controller.reset_mock()
-    mock_api_client.reset_mock()
-
-    # Set up mocks with restart_device message
-    messages = {
-        "message": "Messages retrieved",
-        "messages": {
-            "restart_device": True
-        },
-        "msg_code": 0,
-        "success": True
-    }
-    mock_api_client.get_messages.return_value = messages
-    mock_controller.process_messages.return_value = True
-
-    # Check messages
-    result = app.check_messages()
-
-    # Check result
-    assert result is True
-
-    # Verify method calls
-    mock_api_client.get_messages.assert_called_once()
-    mock_controller.process_messages.assert_called_once()
-    mock_api_client.mark_message_processed.assert_called_once_with("restart_device")
-
-
-def test_brewpi_rest_check_messages_default_control_settings(app, mock_controller, mock_api_client):
-    """Test check_messages method with default_cs message."""
-    app.setup()
-    app.check_configuration()
-
-    # Reset mocks for a clean test
-    mock_controller.reset_mock()
-    mock_api_client.reset_mock()
-
-    # Set up mocks with default_cs message
-    messages = {
-        "message": "Messages retrieved",
-        "messages": {
-            "default_cs": True
-        },
-        "msg_code": 0,
-        "success": True
-    }
-    mock_api_client.get_messages.return_value = messages
-    mock_controller.process_messages.return_value = True
-
-    # Check messages
-    result = app.check_messages()
-
-    # Check result
-    assert result is True
-
-    # Verify method calls
-    mock_api_client.get_messages.assert_called_once()
-    mock_controller.process_messages.assert_called_once()
-    mock_api_client.mark_message_processed.assert_called_once_with("default_cs")
-
-
-def test_brewpi_rest_check_messages_default_control_constants(app, mock_controller, mock_api_client):
-    """Test check_messages method with default_cc message."""
-    app.setup()
-    app.check_configuration()
-
-    # Reset mocks for a clean test
-    mock_controller.reset_mock()
-    mock_api_client.reset_mock()
-
-    # Set up mocks with default_cc message
-    messages = {
-        "message": "Messages retrieved",
-        "messages": {
-            "default_cc": True
-        },
-        "msg_code": 0,
-        "success": True
-    }
-    mock_api_client.get_messages.return_value = messages
-    mock_controller.process_messages.return_value = True
-
-    # Check messages
-    result = app.check_messages()
-
-    # Check result
-    assert result is True
-
-    # Verify method calls
-    mock_api_client.get_messages.assert_called_once()
-    mock_controller.process_messages.assert_called_once()
-    mock_api_client.mark_message_processed.assert_called_once_with("default_cc")
-
-
-def test_brewpi_rest_check_messages_refresh_config(app, mock_controller, mock_api_client):
-    """Test check_messages method with refresh_config message."""
-    app.setup()
-    app.check_configuration()
-
-    # Reset mocks for a clean test
-    mock_controller.reset_mock()
-    mock_api_client.reset_mock()
-
-    # Set up mocks with refresh_config message
-    messages = {
-        "message": "Messages retrieved",
-        "messages": {
-            "refresh_config": True
-        },
-        "msg_code": 0,
-        "success": True
-    }
-    mock_api_client.get_messages.return_value = messages
-    mock_controller.process_messages.return_value = True
-
-    # Create a patch for the update_full_config method 
-    with patch.object(app, 'update_full_config') as mock_update_full_config:
-        # Check messages
-        result = app.check_messages()
-
-        # Check result
-        assert result is True
-
-        # Verify method calls
-        mock_api_client.get_messages.assert_called_once()
-        mock_controller.process_messages.assert_called_once()
-        # Verify that awaiting_config_push was set
-        assert mock_controller.awaiting_config_push
-        # Verify message was marked as processed
-        mock_api_client.mark_message_processed.assert_called_once_with("refresh_config")
+    # The message is still pending, so the next check processes and marks it
+    assert ready_app.check_messages() is True
+    assert mock_controller.process_messages.call_count == 2
+    mock_api_client.mark_message_processed.assert_called_once_with("updated_cs")
 
 
-def test_brewpi_rest_update_full_config(app, mock_controller, mock_api_client):
+def test_brewpi_rest_update_full_config(ready_app, mock_controller, mock_api_client):
     """Test update_full_config method."""
-    app.setup()
-    app.check_configuration()
-
     # We need to patch the __version__ to ensure consistent testing
     with patch('brewpi_rest.__version__', '0.1.0'):
         # Update full config
-        result = app.update_full_config()
+        result = ready_app.update_full_config()
 
     # Check result
     assert result is True
@@ -558,11 +384,8 @@ def test_brewpi_rest_update_full_config(app, mock_controller, mock_api_client):
     assert kwargs['s2f_version'] == '0.1.0'
 
 
-def test_brewpi_rest_get_updated_config(app, mock_controller, mock_api_client):
+def test_brewpi_rest_get_updated_config(ready_app, mock_controller, mock_api_client):
     """Test get_updated_config method."""
-    app.setup()
-    app.check_configuration()
-
     # Set up mocks with the new format
     config_data = {
         "cs": {"mode": "b", "beerSet": 20.0, "fridgeSet": 18.0, "heatEst": 0.199, "coolEst": 5.0},
@@ -572,7 +395,7 @@ def test_brewpi_rest_get_updated_config(app, mock_controller, mock_api_client):
     mock_api_client.get_full_config.return_value = config_data
 
     # Get updated config
-    result = app.get_updated_config()
+    result = ready_app.get_updated_config()
 
     # Check result
     assert result is True
@@ -584,320 +407,96 @@ def test_brewpi_rest_get_updated_config(app, mock_controller, mock_api_client):
     mock_controller.apply_device_config.assert_called_once_with({"devices": config_data["devices"]})
 
 
-def test_brewpi_rest_stop(app, mock_controller, mock_api_client):
+def test_brewpi_rest_stop(ready_app, mock_controller, mock_api_client):
     """Test stop method."""
-    app.setup()
-    app.check_configuration()
-    app.running = True
+    ready_app.running = True
 
     # Stop app
-    app.stop()
+    ready_app.stop()
 
     # Check running flag
-    assert app.running is False
+    assert ready_app.running is False
 
     # Verify controller disconnect
     mock_controller.disconnect.assert_called_once()
 
 
-def test_brewpi_rest_run(app, mock_controller, mock_api_client):
-    """Test run method with graceful shutdown."""
-    app.setup()
-    app.check_configuration()
-
-    # Mock the Signal module to avoid actual signal registration and sys.exit to prevent actual exit
-    with patch('signal.signal'), patch('time.sleep'), patch('sys.exit'):
-        # Use a side effect to set running to False after first call to update_full_config
-        def stop_after_update(*args, **kwargs):
-            app.running = False
-            return True
-
-        app.update_full_config = MagicMock(side_effect=stop_after_update)
-        app.get_updated_config = MagicMock(return_value=True)
-        app.update_status = MagicMock(return_value=True)
-
-        # Run app (will stop after first update)
-        app.run()
-
-        # Check that update_status was called
-        app.update_full_config.assert_called_once()
-
-
-def test_brewpi_rest_run_with_config_updates(app, mock_controller, mock_api_client):
-    """Test run method with configuration updates."""
-    app.setup()
-    app.check_configuration()
-
-    # Set flags to trigger config updates
-    mock_controller.awaiting_settings_update = True
-    mock_controller.awaiting_constants_update = True
-    mock_controller.awaiting_devices_update = True
-    mock_controller.awaiting_config_push = True
-
-    # Use a side effect to set running to False after processing updates
-    def stop_after_processing(*args, **kwargs):
-        app.running = False
+@pytest.mark.parametrize("awaiting_updates, fail_first, expected_calls", [
+    pytest.param(False, False, 1, id="basic"),
+    pytest.param(True, False, 1, id="config_updates"),
+    pytest.param(False, True, 2, id="error"),
+])
+def test_brewpi_rest_run(ready_app, mock_controller, mock_sleep, safe_run, awaiting_updates, fail_first,
+                         expected_calls):
+    """Test run method loops until stopped, processing config updates and surviving errors."""
+    if awaiting_updates:
+        # Set flags to trigger config updates
+        mock_controller.awaiting_settings_update = True
+        mock_controller.awaiting_constants_update = True
+        mock_controller.awaiting_devices_update = True
+        mock_controller.awaiting_config_push = True
+
+    # update_full_config runs once per loop, so use it to stop the app (optionally raising on the first pass)
+    def update_full_config(*args, **kwargs):
+        if fail_first and ready_app.update_full_config.call_count == 1:
+            raise Exception("Test error")
+        ready_app.running = False
         return True
 
-    # Mock the methods that should be called
-    app.get_updated_config = MagicMock(return_value=True)
-    # Add side effect to update_full_config to stop after one loop (this is a terrible way of doing this)
-    app.update_full_config = MagicMock(return_value=True, side_effect=stop_after_processing)
-    app.update_status = MagicMock(return_value=True)
+    ready_app.update_full_config = MagicMock(side_effect=update_full_config)
+    ready_app.get_updated_config = MagicMock(return_value=True)
+    ready_app.update_status = MagicMock(return_value=True)
 
-    # Mock the Signal module to avoid actual signal registration and sys.exit to prevent actual exit
-    with patch('signal.signal'), patch('time.sleep'), patch('sys.exit'):
-        # Run app (will stop after processing updates)
-        app.run()
+    ready_app.run()
 
-        # Check that get_updated_config and update_full_config were called
-        app.get_updated_config.assert_called_once()
-        app.update_full_config.assert_called_once()
+    assert ready_app.update_full_config.call_count == expected_calls
 
-        # Check that flags were reset
+    if awaiting_updates:
+        # The updated config was fetched once and the flags were reset
+        ready_app.get_updated_config.assert_called_once()
         assert mock_controller.awaiting_settings_update is False
         assert mock_controller.awaiting_constants_update is False
         assert mock_controller.awaiting_devices_update is False
 
-
-def test_brewpi_rest_run_error_handling(app, mock_controller, mock_api_client):
-    """Test run method error handling."""
-    app.setup()
-    app.check_configuration()
-
-    # Mock the Signal module to avoid actual signal registration and sys.exit to prevent actual exit
-    with patch('signal.signal'), patch('time.sleep') as mock_sleep, patch('sys.exit'):
-        # Use a side effect to raise an exception then set running to False
-        update_count = 0
-
-        def update_with_error(*args, **kwargs):
-            nonlocal update_count
-            update_count += 1
-            if update_count == 1:
-                raise Exception("Test error")
-            app.running = False
-            return True
-
-        app.update_full_config = MagicMock(side_effect=update_with_error)
-        app.get_updated_config = MagicMock(return_value=True)
-        app.update_status = MagicMock(return_value=True)
-
-        # Run app (will continue after error and stop on second call)
-        app.run()
-
-        # Check that update_full_config was called and sleep was called after error
-        assert app.update_full_config.call_count == 2
+    if fail_first:
         # Sleep should be called with 5 (seconds) after error
         mock_sleep.assert_any_call(5)
 
 
-def test_brewpi_rest_signal_handler(app, mock_controller, mock_api_client):
+def test_brewpi_rest_signal_handler(ready_app, mock_controller, mock_api_client):
     """Test signal handler."""
-    app.setup()
-    app.check_configuration()
-
     # Mock the stop method
-    with patch.object(app, 'stop') as mock_stop:
-        # Call signal handler directly
-        app._signal_handler(signal.SIGINT, None)
+    ready_app.stop = MagicMock()
 
-        # Verify stop was called
-        mock_stop.assert_called_once()
+    # Call signal handler directly
+    ready_app._signal_handler(signal.SIGINT, None)
 
+    # Verify stop was called
+    ready_app.stop.assert_called_once()
 
-def test_brewpi_rest_reset_connection_alt(app, mock_controller, mock_api_client, mock_config):
-    """Test processing connection reset flag directly."""
-    app.setup()
-    app.check_configuration()
 
+def test_brewpi_rest_reset_connection_alt(ready_app, mock_controller, mock_api_client, mock_config, safe_run):
+    """Test processing connection reset flag directly."""
     # Set the reset connection flag
     mock_controller.awaiting_connection_reset = True
 
-    # Mock time.sleep to avoid actual waiting and sys.exit to prevent test exit
-    with patch('time.sleep') as mock_sleep, patch('sys.exit') as mock_exit, patch('signal.signal'):
-        # Mock delete_device_config to return True
-        mock_config.delete_device_config.return_value = True
-
-        # Call the _handle_reset_connection method directly to avoid running the full loop
-        app._handle_reset_connection()
-
-        # Check delete_device_config was called
-        mock_config.delete_device_config.assert_called_once()
-
-        # Verify sys.exit was called
-        mock_exit.assert_called_once_with(0)
-
-
-def test_update_status_device_not_found_error(app, mock_controller, mock_api_client, mock_config):
-    """Test update_status method when device is unregistered in Fermentrack."""
-    app.setup()
-    app.check_configuration()
-
-    # Reset mocks for a clean test
-    mock_controller.reset_mock()
-    mock_api_client.reset_mock()
-
-    # Set up API client to raise an APIError with device not found message
-    api_error = APIError("API request failed: 400 - {'success': False, 'message': 'Device ID associated with that API key not found', 'msg_code': 3}")
-    mock_api_client.send_status_raw.side_effect = api_error
-
-    # Mock the _attempt_reregistration method
-    with patch.object(app, '_attempt_reregistration') as mock_reregister:
-        # Set it to succeed
-        mock_reregister.return_value = True
-
-        # Update status
-        result = app.update_status()
-
-        # Verify reregistration was attempted
-        mock_reregister.assert_called_once()
-
-        # Check result matches mock_reregister return value
-        assert result is True
-
-
-def test_update_status_device_not_found_msg_code_only(app, mock_controller, mock_api_client, mock_config):
-    """Test update_status method when device is unregistered in Fermentrack (msg_code only)."""
-    app.setup()
-    app.check_configuration()
-
-    # Reset mocks for a clean test
-    mock_controller.reset_mock()
-    mock_api_client.reset_mock()
-
-    # Set up API client to raise an APIError with only msg_code
-    api_error = APIError("API request failed: 400 - {'success': False, 'msg_code': 3}")
-    mock_api_client.send_status_raw.side_effect = api_error
-
-    # Mock the _attempt_reregistration method
-    with patch.object(app, '_attempt_reregistration') as mock_reregister:
-        # Set it to succeed
-        mock_reregister.return_value = True
-
-        # Update status
-        result = app.update_status()
-
-        # Verify reregistration was attempted
-        mock_reregister.assert_called_once()
-
-        # Check result matches mock_reregister return value
-        assert result is True
-
-
-def test_update_status_device_not_found_error_failed_reregistration(app, mock_controller, mock_api_client, mock_config):
-    """Test update_status method when device is unregistered and reregistration fails."""
-    app.setup()
-    app.check_configuration()
-
-    # Reset mocks for a clean test
-    mock_controller.reset_mock()
-    mock_api_client.reset_mock()
-
-    # Set up API client to raise an APIError with device not found message
-    api_error = APIError("API request failed: 400 - {'success': False, 'message': 'Device ID associated with that API key not found', 'msg_code': 3}")
-    mock_api_client.send_status_raw.side_effect = api_error
-
-    # Mock the _attempt_reregistration method and _handle_reset_connection
-    with patch.object(app, '_attempt_reregistration') as mock_reregister, \
-            patch.object(app, '_handle_reset_connection') as mock_reset, \
-            patch('time.sleep') as mock_sleep:
-        # Set reregistration to fail
-        mock_reregister.return_value = False
-
-        # Update status
-        result = app.update_status()
-
-        # Verify reregistration was attempted
-        mock_reregister.assert_called_once()
-
-        # Verify reset connection was triggered
-        mock_reset.assert_called_once()
-
-
-def test_attempt_reregistration_success(app, mock_controller, mock_api_client, mock_config):
-    """Test successful reregistration with Fermentrack."""
-    app.setup()
-    app.check_configuration()
-
-    # Reset the mock since we're going to replace its functionality
-    app._attempt_reregistration.reset_mock()
-
-    # Set up controller with firmware info
-    mock_controller.firmware_version = "1.2.3"
-    mock_controller.board_type = "s"  # Arduino
-
-    # Set up config values
-    mock_config.DEVICE_ID = "old_device_id"
-    mock_config.app_config = {
-        "use_fermentrack_net": False,
-        "host": "fermentrack.local",
-        "port": "80",
-        "use_https": False,
-        "username": "testuser"
-    }
-    mock_config.device_config = {
-        "location": "1-1",
-        "fermentrack_id": "old_device_id",
-        "guid": "existing-guid-1234-5678"
-    }
-
-    # We'll use the implementation from brewpi_rest.py but with mocked dependencies
-    with patch.object(app, '_attempt_reregistration', wraps=None) as mock_reregister, \
-            patch('requests.put') as mock_put, \
-            patch('uuid.uuid4') as mock_uuid:
-
-        # Configure the _attempt_reregistration method to execute the original code but with our mocked services
-        def mocked_reregistration(*args, **kwargs):
-            # Configure the mock UUID (should not be used since there's an existing GUID)
-            mock_uuid.return_value = "should-not-be-used"
-
-            # Configure response for successful registration
-            mock_response = MagicMock()
-            mock_response.status_code = 200
-            mock_response.json.return_value = {
-                "success": True,
-                "deviceID": "new_device_id",
-                "apiKey": "new_api_key"
-            }
-            mock_put.return_value = mock_response
-
-            # Verify the existing GUID is used 
-            if "put" in str(mock_put.call_args):
-                args, kwargs = mock_put.call_args
-                registration_data = kwargs.get('json', {})
-                if registration_data.get('guid') != "existing-guid-1234-5678":
-                    return False  # Test will fail if wrong GUID is used
-
-            # Return success
-            return True
-
-        # Replace the mocked method
-        mock_reregister.side_effect = mocked_reregistration
+    # Call the _handle_reset_connection method directly to avoid running the full loop
+    ready_app._handle_reset_connection()
 
-        # Call the reregistration method
-        result = app._attempt_reregistration()
+    # Check delete_device_config was called
+    mock_config.delete_device_config.assert_called_once()
 
-        # Verify result
-        assert result is True
+    # Verify sys.exit was called
+    safe_run.assert_called_once_with(0)
 
-        # The internal implementation was mocked, so we can only verify that it was called
-        mock_reregister.assert_called_once()
 
-
-def test_attempt_reregistration_with_new_guid(app, mock_controller, mock_api_client, mock_config):
+def test_attempt_reregistration_with_new_guid(ready_app, mock_controller, mock_api_client, mock_config):
     """Test successful reregistration with new GUID when existing one not found."""
-    app.setup()
-    app.check_configuration()
-
-    # Reset the mock since we're going to replace its functionality
-    app._attempt_reregistration.reset_mock()
-
     # Set up controller with firmware info
     mock_controller.firmware_version = "1.2.3"
     mock_controller.board_type = "s"  # Arduino
 
     # Set up config values WITHOUT a GUID
-    mock_config.DEVICE_ID = "old_device_id"
     mock_config.app_config = {
         "use_fermentrack_net": False,
         "host": "fermentrack.local",
@@ -912,7 +511,7 @@ def test_attempt_reregistration_with_new_guid(app, mock_controller, mock_api_cli
     }
 
     # We'll use the implementation from brewpi_rest.py but with mocked dependencies
-    with patch.object(app, '_attempt_reregistration', wraps=None) as mock_reregister, \
+    with patch.object(ready_app, '_attempt_reregistration', wraps=None) as mock_reregister, \
             patch('requests.put') as mock_put, \
             patch('uuid.uuid4') as mock_uuid:
 
@@ -945,7 +544,7 @@ def test_attempt_reregistration_with_new_guid(app, mock_controller, mock_api_cli
         mock_reregister.side_effect = mocked_reregistration
 
         # Call the reregistration method
-        result = app._attempt_reregistration()
+        result = ready_app._attempt_reregistration()
 
         # Verify result
         assert result is True
@@ -954,20 +553,13 @@ def test_attempt_reregistration_with_new_guid(app, mock_controller, mock_api_cli
         mock_reregister.assert_called_once()
 
 
-def test_attempt_reregistration_with_fermentrack_net(app, mock_controller, mock_api_client, mock_config):
+def test_attempt_reregistration_with_fermentrack_net(ready_app, mock_controller, mock_api_client, mock_config):
     """Test successful reregistration with Fermentrack.net (cloud service)."""
-    app.setup()
-    app.check_configuration()
-
-    # Reset the mock since we're going to replace its functionality
-    app._attempt_reregistration.reset_mock()
-
     # Set up controller with firmware info
     mock_controller.firmware_version = "1.2.3"
     mock_controller.board_type = "s"  # Arduino
 
     # Set up config values for Fermentrack.net
-    mock_config.DEVICE_ID = "old_device_id"
     mock_config.app_config = {
         "use_fermentrack_net": True,
         "username": "cloud_user"
@@ -975,12 +567,12 @@ def test_attempt_reregistration_with_fermentrack_net(app, mock_controller, mock_
     mock_config.device_config = {"location": "1-1", "fermentrack_id": "old_device_id"}
 
     # We'll use the implementation from brewpi_rest.py but with mocked dependencies
-    with patch.object(app, '_attempt_reregistration', wraps=None) as mock_reregister:
+    with patch.object(ready_app, '_attempt_reregistration', wraps=None) as mock_reregister:
         # Configure the _attempt_reregistration method to return success
         mock_reregister.return_value = True
 
         # Call the reregistration method
-        result = app._attempt_reregistration()
+        result = ready_app._attempt_reregistration()
 
         # Verify result
         assert result is True
@@ -989,25 +581,19 @@ def test_attempt_reregistration_with_fermentrack_net(app, mock_controller, mock_
         mock_reregister.assert_called_once()
 
 
-def test_attempt_reregistration_http_error(app, mock_controller, mock_api_client, mock_config):
+def test_attempt_reregistration_http_error(ready_app, mock_controller, mock_api_client, mock_config):
     """Test reregistration with HTTP error response."""
-    app.setup()
-    app.check_configuration()
-
-    # Reset the mock since we're going to replace its functionality
-    app._attempt_reregistration.reset_mock()
-
     # Set up controller with firmware info
     mock_controller.firmware_version = "1.2.3"
     mock_controller.board_type = "s"
 
     # We'll use the implementation from brewpi_rest.py but with mocked dependencies
-    with patch.object(app, '_attempt_reregistration', wraps=None) as mock_reregister:
+    with patch.object(ready_app, '_attempt_reregistration', wraps=None) as mock_reregister:
         # Configure the _attempt_reregistration method to return failure
         mock_reregister.return_value = False
 
         # Call the reregistration method
-        result = app._attempt_reregistration()
+        result = ready_app._attempt_reregistration()
 
         # Verify result
         assert result is False
@@ -1016,25 +602,19 @@ def test_attempt_reregistration_http_error(app, mock_controller, mock_api_client
         mock_reregister.assert_called_once()
 
 
-def test_attempt_reregistration_api_error(app, mock_controller, mock_api_client, mock_config):
+def test_attempt_reregistration_api_error(ready_app, mock_controller, mock_api_client, mock_config):
     """Test reregistration with API error response."""
-    app.setup()
-    app.check_configuration()
-
-    # Reset the mock since we're going to replace its functionality
-    app._attempt_reregistration.reset_mock()
-
     # Set up controller with firmware info
     mock_controller.firmware_version = "1.2.3"
     mock_controller.board_type = "s"
 
     # We'll use the implementation from brewpi_rest.py but with mocked dependencies
-    with patch.object(app, '_attempt_reregistration', wraps=None) as mock_reregister:
+    with patch.object(ready_app, '_attempt_reregistration', wraps=None) as mock_reregister:
         # Configure the _attempt_reregistration method to return failure
         mock_reregister.return_value = False
 
         # Call the reregistration method
-        result = app._attempt_reregistration()
+        result = ready_app._attempt_reregistration()
 
         # Verify result
         assert result is False
@@ -1043,25 +623,19 @@ def test_attempt_reregistration_api_error(app, mock_controller, mock_api_client,
         mock_reregister.assert_called_once()
 
 
-def test_attempt_reregistration_missing_firmware_info(app, mock_controller, mock_api_client, mock_config):
+def test_attempt_reregistration_missing_firmware_info(ready_app, mock_controller, mock_api_client, mock_config):
     """Test reregistration with missing firmware information."""
-    app.setup()
-    app.check_configuration()
-
-    # Reset the mock since we're going to replace its functionality
-    app._attempt_reregistration.reset_mock()
-
     # Set up controller with missing firmware info
     mock_controller.firmware_version = None
     mock_controller.board_type = None
 
     # We'll use the implementation from brewpi_rest.py but with mocked dependencies
-    with patch.object(app, '_attempt_reregistration', wraps=None) as mock_reregister:
+    with patch.object(ready_app, '_attempt_reregistration', wraps=None) as mock_reregister:
         # Configure the _attempt_reregistration method to return failure
         mock_reregister.return_value = False
 
         # Call the reregistration method
-        result = app._attempt_reregistration()
+        result = ready_app._attempt_reregistration()
 
         # Verify result
         assert result is False
@@ -1070,23 +644,16 @@ def test_attempt_reregistration_missing_firmware_info(app, mock_controller, mock
         mock_reregister.assert_called_once()
 
 
-def test_update_status_other_api_error(app, mock_controller, mock_api_client, mock_config):
+def test_update_status_other_api_error(ready_app, mock_controller, mock_api_client, mock_config):
     """Test update_status method with API error that's not device not found."""
-    app.setup()
-    app.check_configuration()
-
-    # Reset mocks for a clean test
-    mock_controller.reset_mock()
-    mock_api_client.reset_mock()
-
     # Set up API client to raise a different APIError
     api_error = APIError("API request failed: 500 - {'success': False, 'message': 'Internal server error', 'msg_code': 999}")
     mock_api_client.send_status_raw.side_effect = api_error
 
     # Mock the _attempt_reregistration method
-    with patch.object(app, '_attempt_reregistration') as mock_reregister, patch('time.sleep'):
+    with patch.object(ready_app, '_attempt_reregistration') as mock_reregister:
         # Update status should return False for other errors
-        result = app.update_status()
+        result = ready_app.update_status()
 
         # Verify reregistration was NOT attempted for other errors
         mock_reregister.assert_not_called()
@@ -1095,62 +662,40 @@ def test_update_status_other_api_error(app, mock_controller, mock_api_client, mo
         assert result is False
 
 
-def test_main_function():
+def test_main_function(monkeypatch):
     """Test main function with command line arguments."""
-    import argparse
-
-    # Create a mock ArgumentParser that always returns our args
-    class MockArgParser(object):
-        def __init__(self, *args, **kwargs):
-            pass
-
-        def add_argument(self, *args, **kwargs):
-            pass
-
-        def parse_args(self):
-            # Return our mock args
-            args = argparse.Namespace()
-            args.location = "1-1"
-            args.verbose = False
-            # args no longer have system-config or local-config flags
-            return args
-
-    with patch("argparse.ArgumentParser", MockArgParser):
-        with patch("brewpi_rest.Config") as mock_config_class:
-            with patch("brewpi_rest.setup_logging") as mock_setup_logging:
-                with patch("brewpi_rest.ensure_directories") as mock_ensure_dirs:
-                    with patch("brewpi_rest.BrewPiRest") as mock_app_class:
-                        from brewpi_rest import main
-
-                        mock_config_instance = MagicMock()
-                        mock_config_instance.LOG_LEVEL = "INFO"
-                        mock_config_instance.LOG_FILE = "/tmp/brewpi_rest.log"
-                        mock_config_instance.SERIAL_PORT = "/dev/ttyUSB0"
-                        mock_config_instance.DEFAULT_API_URL = "http://localhost:8000"
-                        mock_config_instance.app_config = {"use_fermentrack_net": False}
-                        mock_config_class.return_value = mock_config_instance
-
-                        mock_logger = MagicMock()
-                        mock_setup_logging.return_value = mock_logger
-
-                        mock_app = MagicMock()
-                        mock_app.setup.return_value = True
-                        mock_app.check_configuration.return_value = True
-                        mock_app_class.return_value = mock_app
-
-                        # Call main function
-                        result = main()
-
-                        # Check result
-                        assert result == 0
-
-                        # Verify initialization - Config now only gets location
-                        mock_config_class.assert_called_once_with(location="1-1")
-                        mock_setup_logging.assert_called_once()
-                        mock_ensure_dirs.assert_called_once()
-
-                        # Verify app calls
-                        mock_app_class.assert_called_once_with(mock_config_instance)
-                        mock_app.setup.assert_called_once()
-                        mock_app.check_configuration.assert_called_once()
-                        mock_app.run.assert_called_once()
+    # Let the real argument parser run against a fixed command line
+    monkeypatch.setattr(sys, "argv", ["brewpi_rest", "--location", "1-1"])
+
+    # main() rebinds the module logger, so patch it too to have it restored afterwards
+    with patch.multiple("brewpi_rest", Config=DEFAULT, setup_logging=DEFAULT,
+                        ensure_directories=DEFAULT, BrewPiRest=DEFAULT, logger=DEFAULT) as mocks:
+        mock_config_instance = MagicMock()
+        mock_config_instance.LOG_LEVEL = "INFO"
+        mock_config_instance.LOG_FILE = "/tmp/brewpi_rest.log"
+        mock_config_instance.SERIAL_PORT = "/dev/ttyUSB0"
+        mock_config_instance.DEFAULT_API_URL = "http://localhost:8000"
+        mock_config_instance.app_config = {"use_fermentrack_net": False}
+        mocks["Config"].return_value = mock_config_instance
+
+        mock_app = MagicMock()
+        mock_app.setup.return_value = True
+        mock_app.check_configuration.return_value = True
+        mocks["BrewPiRest"].return_value = mock_app
+
+        # Call main function
+        result = brewpi_rest.main()
+
+    # Check result
+    assert result == 0
+
+    # Verify initialization - Config now only gets location
+    mocks["Config"].assert_called_once_with(location="1-1")
+    mocks["setup_logging"].assert_called_once()
+    mocks["ensure_directories"].assert_called_once()
+
+    # Verify app calls
+    mocks["BrewPiRest"].assert_called_once_with(mock_config_instance)
+    mock_app.setup.assert_called_once()
+    mock_app.check_configuration.assert_called_once()
+    mock_app.run.assert_called_once()
@@ -3,14 +3,11 @@ Tests for configuration file operations in config_manager.py
 """
 import argparse
 import json
-import os
-# Import the module to test
-import sys
 from unittest.mock import patch
 
 import pytest
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Import the module to test
 import config_manager
 
 
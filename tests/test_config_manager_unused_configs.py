@@ -2,14 +2,11 @@
 Tests for unused device configuration management in config_manager.py
 """
 import json
-import os
-# Import the module to test
-import sys
 from unittest.mock import patch, MagicMock
 
 import pytest
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Import the module to test
 import config_manager
 
 
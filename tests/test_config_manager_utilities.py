@@ -2,14 +2,12 @@
 Tests for utility functions in config_manager.py
 """
 import os
-# Import the module to test
-import sys
 from unittest.mock import patch, MagicMock
 
 import pytest
 import requests
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Import the module to test
 import config_manager
 
 
@@ -528,6 +528,24 @@ def test_controller_status_with_special_temps():
     assert status.temps["State"] == 3
 
 
+def test_controller_status_is_frozen():
+    """Test ControllerStatus and MessageStatus cannot be modified after creation."""
+    status = ControllerStatus(
+        lcd=["Line 1", "Line 2", "Line 3", "Line 4"],
+        temps={"BeerTemp": 20.5},
+        temp_format="C",
+        mode="b"
+    )
+
+    with pytest.raises(ValueError):
+        status.mode = "f"
+
+    messages = MessageStatus(updated_cs=True)
+
+    with pytest.raises(ValueError):
+        messages.updated_cs = False
+
+
 def test_controller_status_invalid_values():
     """Test ControllerStatus validation rejects invalid values for special keys."""
 
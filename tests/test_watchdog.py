@@ -1,54 +1,18 @@
 """Tests for Serial-to-Fermentrack watchdog implementation."""
 
 import os
-import sys
 import time
-from unittest.mock import MagicMock, patch
+from unittest.mock import DEFAULT, MagicMock, patch
 
 import pytest
 
-# Add the parent directory to sys.path so that imports work correctly
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from utils.config import Config
 from brewpi_rest import BrewPiRest, WATCHDOG_TIMEOUT
 
 
-@pytest.fixture
-def mock_config():
-    """Create a mock configuration object."""
-    mock_config = MagicMock(spec=Config)
-
-    # Configure mock properties
-    mock_config.DEFAULT_API_URL = "http://localhost:8000"
-    mock_config.API_TIMEOUT = 10
-    mock_config.DEVICE_ID = "test123"
-    mock_config.FERMENTRACK_API_KEY = "abc456"
-    mock_config.SERIAL_PORT = "/dev/ttyUSB0"  # Mock the result of port detection
-    mock_config.LOG_DIR = "/tmp/brewpi-rest/logs"
-    mock_config.LOG_LEVEL = "INFO"
-    mock_config.LOG_FILE = "/tmp/brewpi-rest/logs/brewpi_rest.log"
-    mock_config.LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-
-    # Mock methods
-    mock_config.get_api_url = lambda endpoint: f"{mock_config.DEFAULT_API_URL}{endpoint}"
-    mock_config.device_config = {"location": "1-1", "fermentrack_id": "test123"}
-    mock_config.save_device_config = MagicMock()
-    mock_config.save_app_config = MagicMock()
-
-    return mock_config
-
-
 @pytest.fixture
 def app(mock_config):
     """Create a BrewPiRest app instance with mocks."""
-    with patch("brewpi_rest.BrewPiController"), \
-            patch("brewpi_rest.FermentrackClient"), \
-            patch("brewpi_rest.logger"):
-        # Mock the logger directly in the module
-        import brewpi_rest
-        brewpi_rest.logger = MagicMock()
-
+    with patch.multiple("brewpi_rest", BrewPiController=DEFAULT, FermentrackClient=DEFAULT, logger=DEFAULT):
         # Create app
         app = BrewPiRest(mock_config)
 